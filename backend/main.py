@@ -5,7 +5,8 @@ C语言Bug检测器主程序
 import os
 import sys
 import argparse
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
 from colorama import init, Fore, Style
 
 # 初始化colorama
@@ -73,9 +74,7 @@ class CBugDetector:
                 if self.module_enabled[module_name]:
                     print(f"{Fore.GREEN}📋 运行模块: {module.get_module_name()}{Style.RESET_ALL}")
                     try:
-                        reports = module.analyze(parsed_data)
-                        for report in reports:
-                            self.error_reporter.add_report(report)
+                        self.error_reporter.add_reports(module.analyze(parsed_data))
                     except Exception as e:
                         print(f"{Fore.RED}❌ 模块 {module_name} 运行出错: {e}{Style.RESET_ALL}")
             
@@ -85,7 +84,7 @@ class CBugDetector:
             print(f"{Fore.RED}❌ 分析文件时出错: {e}{Style.RESET_ALL}")
             return []
     
-    def analyze_directory(self, directory_path: str) -> Dict[str, List[BugReport]]:
+    def analyze_directory(self, directory_path: str, workers: Optional[int] = None) -> Dict[str, List[BugReport]]:
         """分析目录中的所有C文件"""
         print(f"{Fore.CYAN}🔍 正在分析目录: {directory_path}{Style.RESET_ALL}")
         
@@ -93,16 +92,40 @@ class CBugDetector:
             print(f"{Fore.RED}❌ 错误: 目录 {directory_path} 不存在{Style.RESET_ALL}")
             return {}
         
-        results = {}
-        
-        # 遍历目录中的所有C文件
+        # 收集目录中的所有C文件
+        file_paths = []
         for root, dirs, files in os.walk(directory_path):
             for file in files:
                 if file.endswith('.c'):
-                    file_path = os.path.join(root, file)
-                    reports = self.analyze_file(file_path)
-                    if reports:
-                        results[file_path] = reports
+                    file_paths.append(os.path.join(root, file))
+        
+        return self.analyze_files(file_paths, workers)
+    
+    def analyze_files(self, file_paths: List[str], workers: Optional[int] = None) -> Dict[str, List[BugReport]]:
+        """分析多个C文件，文件数量大于1时使用多进程并行分析"""
+        if workers is None:
+            workers = os.cpu_count() or 1
+        
+        results = {}
+        
+        if workers <= 1 or len(file_paths) <= 1:
+            for file_path in file_paths:
+                reports = self.analyze_file(file_path)
+                if reports:
+                    # analyze_file返回的列表会在下次分析时被清空，需要复制
+                    results[file_path] = list(reports)
+            return results
+        
+        # 每个子进程在初始化时创建自己的检测器实例
+        max_workers = min(workers, len(file_paths))
+        # 文件按批分发，减少进程间通信次数；每个进程仍能分到若干批以平衡负载
+        chunksize = max(1, min(8, len(file_paths) // (max_workers * 4)))
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_worker,
+                                 initargs=(dict(self.module_enabled),)) as executor:
+            for file_path, reports in executor.map(_analyze_in_worker, file_paths, chunksize=chunksize):
+                if reports:
+                    results[file_path] = reports
         
         return results
     
@@ -135,7 +158,8 @@ class CBugDetector:
     def generate_report(self, reports: List[BugReport], output_format: str = 'text') -> str:
         """生成检测报告"""
         if output_format == 'text':
-            return self.error_reporter.format_all_reports()
+            # 按传入的报告格式化；多进程分析时报告来自子进程，本进程的报告器是空的
+            return self.error_reporter.format_reports(reports)
         elif output_format == 'json':
             import json
             report_data = []
@@ -164,6 +188,22 @@ class CBugDetector:
             print(f"{Fore.RED}❌ 保存报告时出错: {e}{Style.RESET_ALL}")
 
 
+# 子进程中使用的检测器实例
+_worker_detector: Optional[CBugDetector] = None
+
+
+def _init_worker(module_enabled: Dict[str, bool]):
+    """初始化子进程的检测器"""
+    global _worker_detector
+    _worker_detector = CBugDetector()
+    _worker_detector.module_enabled.update(module_enabled)
+
+
+def _analyze_in_worker(file_path: str):
+    """在子进程中分析单个文件"""
+    return file_path, list(_worker_detector.analyze_file(file_path))
+
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='C语言Bug检测器')
@@ -174,6 +214,7 @@ def main():
     parser.add_argument('--enable', nargs='+', help='启用的模块列表')
     parser.add_argument('--list-modules', action='store_true', help='列出所有可用模块')
     parser.add_argument('--batch', action='store_true', help='批量处理模式')
+    parser.add_argument('-j', '--jobs', type=int, help='目录分析时的并行进程数（默认使用CPU核心数）')
     
     args = parser.parse_args()
     
@@ -215,7 +256,7 @@ def main():
     
     elif args.input and os.path.isdir(args.input):
         # 目录分析
-        results = detector.analyze_directory(args.input)
+        results = detector.analyze_directory(args.input, args.jobs)
         
         if results:
             total_issues = sum(len(reports) for reports in results.values())
@@ -2,9 +2,11 @@
 内存安全卫士模块 - 检测内存泄漏、野指针、空指针解引用
 """
 import re
+import bisect
+import itertools
 from typing import Dict, List, Set
 from utils.error_reporter import ErrorReporter
-from utils.code_parser import CCodeParser, VariableInfo
+from utils.code_parser import CCodeParser, VariableInfo, FunctionInfo
 
 
 class MemorySafetyModule:
@@ -18,15 +20,33 @@ class MemorySafetyModule:
         self.variable_states: Dict[str, Dict] = {}
         self.malloced_variables: Set[str] = set()
         self.freed_variables: Set[str] = set()
+        # 变量第一次被free的行号
+        self.free_lines: Dict[str, int] = {}
         
         # 编译正则表达式模式
         self.patterns = {
-            'malloc': re.compile(r'\b(\w+)\s*=\s*malloc\s*\([^)]+\)', re.MULTILINE),
-            'free': re.compile(r'\bfree\s*\([^)]*(\w+)[^)]*\)', re.MULTILINE),
-            'pointer_use': re.compile(r'\*(\w+)', re.MULTILINE),
-            'null_check': re.compile(r'\b(\w+)\s*==\s*NULL\b|\b(\w+)\s*!=\s*NULL\b', re.MULTILINE),
-            'return_local_pointer': re.compile(r'\breturn\s+[^;]*\*[^;]*;', re.MULTILINE),
+            # 整个源码扫描用的模式：NULL检查
+            # 在拼接后的源码上运行，因此所有空白和字符类都不能跨行
+            'line_scan': re.compile(
+                r'(?P<null_check>\b\w+[^\S\n]*[!=]=[^\S\n]*NULL\b)',
+                re.MULTILINE
+            ),
+            # 函数体内的局部变量声明（static变量不是局部存储，单独标记；变量名后紧跟[时为数组）
+            'local_declaration': re.compile(
+                r'\b(?P<static>static\s+)?(?:const\s+)?(?:(?:unsigned|signed|long|short)\s+)*'
+                r'(?:int|char|float|double|long|short|unsigned|signed|void|struct\s+\w+)\b[\s*]*'
+                r'(?P<name>\w+)\s*(?P<array>\[)?'
+            ),
+            # return 变量名; 或 return &变量名;（允许前面带指针类型转换）
+            'return_variable': re.compile(
+                r'\breturn\s*(?:\(\s*[\w\s]+\*+\s*\)\s*)?(?P<address>&\s*)?(?P<name>\w+)\s*;'
+            ),
         }
+        
+        # 每行匹配结果（按匹配类型分桶，存放0基行索引）
+        self.line_matches: Dict[str, Set[int]] = {}
+        # 返回指针的函数
+        self.pointer_functions: List[FunctionInfo] = []
     
     def analyze(self, parsed_data: Dict[str, List]) -> List:
         """分析内存安全问题"""
@@ -36,6 +56,20 @@ class MemorySafetyModule:
         self.variable_states.clear()
         self.malloced_variables.clear()
         self.freed_variables.clear()
+        self.free_lines.clear()
+        
+        self.pointer_functions = [func for func in parsed_data['functions'] if '*' in func.return_type]
+        
+        # 没有内存分配/释放、指针解引用，也没有返回指针的函数时，各项检测都不会报告问题
+        if not (parsed_data['malloc_calls'] or parsed_data['free_calls'] or parsed_data['pointer_dereferences']
+                or self.pointer_functions):
+            return self.error_reporter.get_reports()
+        
+        # 一次扫描所有行，供各检测方法共享
+        self._scan_lines(parsed_data)
+        
+        # 先记录所有被释放的变量，泄漏检测需要用到
+        self._collect_freed_variables(parsed_data)
         
         # 分析各种内存安全问题
         self._detect_memory_leaks(parsed_data)
@@ -45,6 +79,28 @@ class MemorySafetyModule:
         
         return self.error_reporter.get_reports()
     
+    def _scan_lines(self, parsed_data: Dict[str, List]):
+        """用组合模式一次扫描整个源码，按匹配类型记录行号"""
+        lines = parsed_data['lines']
+        source = parsed_data['source']
+        
+        # 每行在拼接源码中的起始偏移，用于把匹配位置映射回行索引
+        line_starts = [0]
+        line_starts.extend(itertools.accumulate(len(line) + 1 for line in lines[:-1]))
+        
+        self.line_matches = {'null_check': set()}
+        for match in self.patterns['line_scan'].finditer(source):
+            i = bisect.bisect_right(line_starts, match.start()) - 1
+            self.line_matches[match.lastgroup].add(i)
+    
+    def _collect_freed_variables(self, parsed_data: Dict[str, List]):
+        """记录所有free的变量"""
+        for free_call in parsed_data['free_calls']:
+            var_name = free_call['variable']
+            if var_name:
+                self.freed_variables.add(var_name)
+                self.free_lines.setdefault(var_name, free_call['line'])
+    
     def _detect_memory_leaks(self, parsed_data: Dict[str, List]):
         """检测内存泄漏"""
         # 记录所有malloc的变量
@@ -64,37 +120,34 @@ class MemorySafetyModule:
                 )
         
         # 检查每个malloc的变量是否都有对应的free
-        for var_name in self.malloced_variables:
-            if var_name not in self.freed_variables:
-                # 查找变量声明的位置
-                var_info = self.parser.get_variable_by_name(var_name, parsed_data)
-                if var_info:
-                    self.error_reporter.add_memory_error(
-                        var_info.line_number,
-                        f"变量 '{var_name}' 分配了内存但未释放，可能导致内存泄漏",
-                        "建议在适当位置添加 free(var_name); 语句",
-                        ""
-                    )
+        for var_name in self.malloced_variables - self.freed_variables:
+            # 查找变量声明的位置
+            var_info = self.parser.get_variable_by_name(var_name, parsed_data)
+            if var_info:
+                self.error_reporter.add_memory_error(
+                    var_info.line_number,
+                    f"变量 '{var_name}' 分配了内存但未释放，可能导致内存泄漏",
+                    "建议在适当位置添加 free(var_name); 语句",
+                    ""
+                )
     
     def _detect_wild_pointers(self, parsed_data: Dict[str, List]):
         """检测野指针"""
-        # 记录所有free的变量
-        for free_call in parsed_data['free_calls']:
-            line_content = free_call['line_content']
-            line_num = free_call['line']
-            
-            # 提取free中的变量名
-            free_match = self.patterns['free'].search(line_content)
-            if free_match:
-                var_name = free_match.group(1)
-                self.freed_variables.add(var_name)
+        # 解析器已按指针名索引好解引用位置
+        derefs_by_pointer = parsed_data['dereferences_by_pointer']
         
-        # 检查free后是否还有使用
-        for deref in parsed_data['pointer_dereferences']:
+        # 检查free后是否还有使用（只取被释放且被解引用的指针，按行号顺序报告）
+        used_after_free = []
+        for ptr_name in self.freed_variables & derefs_by_pointer.keys():
+            free_line = self.free_lines[ptr_name]
+            used_after_free.extend(deref for deref in derefs_by_pointer[ptr_name] if deref['line'] > free_line)
+        used_after_free.sort(key=lambda deref: deref['line'])
+        
+        for deref in used_after_free:
             ptr_name = deref['pointer']
             line_num = deref['line']
             
-            if ptr_name in self.freed_variables:
+            if self.error_reporter.first_report(line_num, ptr_name, 'use_after_free'):
                 self.error_reporter.add_memory_error(
                     line_num,
                     f"指针 '{ptr_name}' 已被释放，但仍在被使用（野指针）",
@@ -106,8 +159,8 @@ class MemorySafetyModule:
         for var in parsed_data['variables']:
             if var.is_pointer and not var.is_initialized:
                 # 查找该指针的使用
-                for deref in parsed_data['pointer_dereferences']:
-                    if deref['pointer'] == var.name and deref['line'] > var.line_number:
+                for deref in derefs_by_pointer.get(var.name, []):
+                    if deref['line'] > var.line_number and self.error_reporter.first_report(deref['line'], var.name, 'uninitialized'):
                         self.error_reporter.add_memory_error(
                             deref['line'],
                             f"指针 '{var.name}' 未初始化就被解引用",
@@ -117,19 +170,19 @@ class MemorySafetyModule:
     
     def _detect_null_pointer_dereference(self, parsed_data: Dict[str, List]):
         """检测空指针解引用"""
+        null_check_lines = self.line_matches['null_check']
+        
         # 检查指针解引用前是否有NULL检查
         for deref in parsed_data['pointer_dereferences']:
             ptr_name = deref['pointer']
             line_num = deref['line']
             
+            # 同一行对同一指针的多次解引用结果相同，只检查一次
+            if not self.error_reporter.first_report(line_num, ptr_name, 'null_check'):
+                continue
+            
             # 检查前面几行是否有NULL检查
-            has_null_check = False
-            for i in range(max(0, line_num - 5), line_num):
-                if i < len(parsed_data['lines']):
-                    line_content = parsed_data['lines'][i]
-                    if self.patterns['null_check'].search(line_content):
-                        has_null_check = True
-                        break
+            has_null_check = any(i in null_check_lines for i in range(max(0, line_num - 5), line_num))
             
             if not has_null_check:
                 self.error_reporter.add_memory_error(
@@ -141,24 +194,39 @@ class MemorySafetyModule:
     
     def _detect_return_local_pointer(self, parsed_data: Dict[str, List]):
         """检测函数返回局部指针"""
-        for func in parsed_data['functions']:
-            if func.return_type and '*' in func.return_type:
-                # 这是一个返回指针的函数
-                func_start_line = func.line_number
-                
-                # 查找函数内的return语句
-                for i in range(func_start_line, len(parsed_data['lines'])):
-                    line_content = parsed_data['lines'][i]
-                    if 'return' in line_content and '*' in line_content:
-                        # 检查是否返回局部变量
-                        if self.patterns['return_local_pointer'].search(line_content):
-                            self.error_reporter.add_memory_error(
-                                i + 1,
-                                f"函数 '{func.name}' 返回局部指针，这是危险的",
-                                "建议返回动态分配的内存或静态变量",
-                                line_content
-                            )
-                        break
+        lines = parsed_data['lines']
+        for func in self.pointer_functions:
+            func_range = self.parser.get_enclosing_function(func.line_number, parsed_data)
+            func_end_line = func_range[2] if func_range else len(lines)
+            # 函数体各行（0基索引），函数头所在行的参数不是局部变量
+            body = range(func.line_number, func_end_line)
+            
+            # 收集函数体内的局部变量：变量名 -> 是否为数组
+            local_variables = {}
+            for i in body:
+                for match in self.patterns['local_declaration'].finditer(lines[i]):
+                    if match.group('static') is None:
+                        local_variables.setdefault(match.group('name'), match.group('array') is not None)
+            if not local_variables:
+                continue
+            
+            # 只有返回局部数组名或局部变量的地址才是返回局部指针
+            for i in body:
+                if 'return' not in lines[i]:
+                    continue
+                match = self.patterns['return_variable'].search(lines[i])
+                if match is None:
+                    continue
+                var_name = match.group('name')
+                is_array = local_variables.get(var_name)
+                if is_array is None or not (is_array or match.group('address')):
+                    continue
+                self.error_reporter.add_memory_error(
+                    i + 1,
+                    f"函数 '{func.name}' 返回局部指针，这是危险的",
+                    "建议返回动态分配的内存或静态变量",
+                    parsed_data['stripped_lines'][i]
+                )
     
     def get_module_name(self) -> str:
         """获取模块名称"""
@@ -2,11 +2,44 @@
 数值与控制流分析器模块 - 检测类型溢出和死循环
 """
 import re
-from typing import Dict, List, Set
+import sys
+import ast
+import functools
+import operator
+from typing import Dict, List, Optional, Set
 from utils.error_reporter import ErrorReporter
 from utils.code_parser import CCodeParser
 
 
+# 数字常量的语法树节点：Python 3.8起为ast.Constant，3.7为ast.Num
+NUMBER_NODE_TYPES = (ast.Constant,) if sys.version_info >= (3, 8) else (ast.Num,)
+
+# 常量表达式求值支持的运算
+CONSTANT_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.LShift: operator.lshift,
+    ast.RShift: operator.rshift,
+}
+CONSTANT_UNARY_OPERATORS = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+# C语言八进制字面量（如 010），求值前转换为Python写法
+C_OCTAL_LITERAL_PATTERN = re.compile(r'\b0([0-7]+)\b')
+
+# 只有Python接受、C语言中不合法的数字写法：数字分隔符_、0o/0b前缀
+NON_C_NUMBER_PATTERN = re.compile(r'_|\b0[oObB]')
+
+# 移位位数上限，避免对超大移位量求值
+MAX_SHIFT_BITS = 128
+
+# 常见的恒定为真的循环条件
+CONSTANT_TRUE_CONDITIONS = frozenset(['1', 'true', '!0', '!NULL', '1==1', '1!=0'])
+
+
 class NumericControlFlowModule:
     """数值与控制流分析器模块"""
     
@@ -30,27 +63,42 @@ class NumericControlFlowModule:
         
         # 编译正则表达式模式
         self.patterns = {
-            'assignment': re.compile(r'\b(\w+)\s*=\s*([^;]+);', re.MULTILINE),
-            'while_loop': re.compile(r'\bwhile\s*\(([^)]+)\)\s*\{', re.MULTILINE),
-            'for_loop': re.compile(r'\bfor\s*\(([^)]+)\)\s*\{', re.MULTILINE),
-            'do_while_loop': re.compile(r'\bdo\s*\{', re.MULTILINE),
-            'break_statement': re.compile(r'\bbreak\s*;', re.MULTILINE),
-            'return_statement': re.compile(r'\breturn\s*[^;]*;', re.MULTILINE),
-            'increment': re.compile(r'\b(\w+)\s*\+\+', re.MULTILINE),
-            'decrement': re.compile(r'\b(\w+)\s*--', re.MULTILINE),
-            'arithmetic': re.compile(r'\b(\w+)\s*[+\-*/]\s*([^;]+)', re.MULTILINE),
+            # 循环退出语句：break / return / goto / exit()
+            'loop_exit': re.compile(r'\bbreak\s*;|\breturn\s*[^;]*;|\bgoto\s+\w+\s*;|\bexit\s*\(', re.MULTILINE),
         }
+        
+        # 行号 -> 该行左大括号对应的右大括号所在行号（来自解析器）
+        self.brace_close: Dict[int, int] = {}
+        # 退出语句行数的前缀和：exit_counts[i] 为第1..i行中含退出语句的行数
+        self.exit_counts: List[int] = [0]
     
     def analyze(self, parsed_data: Dict[str, List]) -> List:
         """分析数值与控制流问题"""
         self.error_reporter.clear_reports()
         
+        # 一次扫描建立大括号配对和退出语句索引，供所有循环检查共用
+        self._build_line_index(parsed_data)
+        
         # 分析各种数值与控制流问题
         self._detect_overflow(parsed_data)
         self._detect_infinite_loops(parsed_data)
         
         return self.error_reporter.get_reports()
     
+    def _build_line_index(self, parsed_data: Dict[str, List]):
+        """取得大括号配对表，建立退出语句前缀和"""
+        self.brace_close = parsed_data['brace_pairs']
+        self.exit_counts = [0]
+        if not parsed_data['loops']:
+            return
+        
+        exit_pattern = self.patterns['loop_exit']
+        exit_count = 0
+        for line in parsed_data['lines']:
+            if exit_pattern.search(line):
+                exit_count += 1
+            self.exit_counts.append(exit_count)
+    
     def _detect_overflow(self, parsed_data: Dict[str, List]):
         """检测类型溢出"""
         for assignment in parsed_data['assignments']:
@@ -78,47 +126,55 @@ class NumericControlFlowModule:
                                 assignment['line_content']
                             )
     
-    def _parse_numeric_value(self, expression: str) -> int:
-        """解析数值表达式"""
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _parse_numeric_value(expression: str) -> Optional[int]:
+        """解析数值表达式（仅支持整数常量及 + - * << >> 运算，无法求值时返回None）"""
+        expression = expression.strip()
+        
+        # int和ast.parse都接受Python专有的写法（1_000、0o17、0b11），这些在C中无法编译，不做求值
+        if NON_C_NUMBER_PATTERN.search(expression):
+            return None
+        
+        # 整数字面量（十进制、十六进制，含符号）直接由int解析，无需构建语法树
+        if expression.isascii():
+            try:
+                return int(expression, 0)
+            except ValueError:
+                pass
+        
+        # 其余情况（C八进制、算术表达式）按Python表达式解析后求值
         try:
-            # 移除空格
-            expression = expression.strip()
-            
-            # 处理简单的数值
-            if expression.isdigit():
-                return int(expression)
-            
-            # 处理负数
-            if expression.startswith('-') and expression[1:].isdigit():
-                return int(expression)
-            
-            # 处理十六进制
-            if expression.startswith('0x') or expression.startswith('0X'):
-                return int(expression, 16)
-            
-            # 处理八进制
-            if expression.startswith('0') and len(expression) > 1:
-                return int(expression, 8)
-            
-            # 处理简单的算术表达式
-            if '+' in expression:
-                parts = expression.split('+')
-                if len(parts) == 2:
-                    return self._parse_numeric_value(parts[0]) + self._parse_numeric_value(parts[1])
-            
-            if '-' in expression and not expression.startswith('-'):
-                parts = expression.split('-')
-                if len(parts) == 2:
-                    return self._parse_numeric_value(parts[0]) - self._parse_numeric_value(parts[1])
-            
-            if '*' in expression:
-                parts = expression.split('*')
-                if len(parts) == 2:
-                    return self._parse_numeric_value(parts[0]) * self._parse_numeric_value(parts[1])
-            
+            tree = ast.parse(C_OCTAL_LITERAL_PATTERN.sub(r'0o\1', expression), mode='eval')
+            return NumericControlFlowModule._fold_constant(tree.body)
+        except (SyntaxError, ValueError, RecursionError):
             return None
-        except:
+    
+    @staticmethod
+    def _fold_constant(node: ast.AST) -> Optional[int]:
+        """对常量表达式的语法树求值"""
+        if isinstance(node, NUMBER_NODE_TYPES):
+            value = node.value if hasattr(node, 'value') else node.n
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value
             return None
+        
+        if isinstance(node, ast.UnaryOp) and type(node.op) in CONSTANT_UNARY_OPERATORS:
+            operand = NumericControlFlowModule._fold_constant(node.operand)
+            if operand is None:
+                return None
+            return CONSTANT_UNARY_OPERATORS[type(node.op)](operand)
+        
+        if isinstance(node, ast.BinOp) and type(node.op) in CONSTANT_BINARY_OPERATORS:
+            left = NumericControlFlowModule._fold_constant(node.left)
+            right = NumericControlFlowModule._fold_constant(node.right)
+            if left is None or right is None:
+                return None
+            if isinstance(node.op, (ast.LShift, ast.RShift)) and not 0 <= right <= MAX_SHIFT_BITS:
+                return None
+            return CONSTANT_BINARY_OPERATORS[type(node.op)](left, right)
+        
+        return None
     
     def _detect_infinite_loops(self, parsed_data: Dict[str, List]):
         """检测死循环"""
@@ -127,50 +183,41 @@ class NumericControlFlowModule:
             line_num = loop['line']
             line_content = loop['line_content']
             
+            # 循环条件已由解析器提取，无需再次匹配
             if loop_type == 'while':
-                self._check_while_loop(line_content, line_num, parsed_data)
+                self._check_while_loop(loop['condition'], line_content, line_num, parsed_data)
             elif loop_type == 'for':
-                self._check_for_loop(line_content, line_num, parsed_data)
+                self._check_for_loop(loop['condition'], line_content, line_num, parsed_data)
             elif loop_type == 'do-while':
                 self._check_do_while_loop(line_content, line_num, parsed_data)
     
-    def _check_while_loop(self, line_content: str, line_num: int, parsed_data: Dict[str, List]):
+    def _check_while_loop(self, condition: str, line_content: str, line_num: int, parsed_data: Dict[str, List]):
         """检查while循环"""
-        # 提取while条件
-        while_match = self.patterns['while_loop'].search(line_content)
-        if while_match:
-            condition = while_match.group(1).strip()
-            
-            # 检查是否是恒定为真的条件
-            if self._is_constant_true_condition(condition):
-                # 检查循环体内是否有break或return
-                has_break_or_return = self._check_loop_body_for_exit(line_num, parsed_data)
-                if not has_break_or_return:
-                    self.error_reporter.add_numeric_error(
-                        line_num,
-                        f"while循环条件 '{condition}' 恒定为真且循环体内无退出语句，可能导致死循环",
-                        "建议添加break语句或修改循环条件",
-                        line_content
-                    )
+        # 检查是否是恒定为真的条件
+        if self._is_constant_true_condition(condition):
+            # 检查循环体内是否有break或return
+            has_break_or_return = self._check_loop_body_for_exit(line_num, parsed_data)
+            if not has_break_or_return:
+                self.error_reporter.add_numeric_error(
+                    line_num,
+                    f"while循环条件 '{condition}' 恒定为真且循环体内无退出语句，可能导致死循环",
+                    "建议添加break语句或修改循环条件",
+                    line_content
+                )
     
-    def _check_for_loop(self, line_content: str, line_num: int, parsed_data: Dict[str, List]):
+    def _check_for_loop(self, condition: str, line_content: str, line_num: int, parsed_data: Dict[str, List]):
         """检查for循环"""
-        # 提取for条件
-        for_match = self.patterns['for_loop'].search(line_content)
-        if for_match:
-            condition = for_match.group(1).strip()
-            
-            # 检查是否是恒定为真的条件
-            if self._is_constant_true_condition(condition):
-                # 检查循环体内是否有break或return
-                has_break_or_return = self._check_loop_body_for_exit(line_num, parsed_data)
-                if not has_break_or_return:
-                    self.error_reporter.add_numeric_error(
-                        line_num,
-                        f"for循环条件 '{condition}' 恒定为真且循环体内无退出语句，可能导致死循环",
-                        "建议添加break语句或修改循环条件",
-                        line_content
-                    )
+        # 检查是否是恒定为真的条件
+        if self._is_constant_true_condition(condition):
+            # 检查循环体内是否有break或return
+            has_break_or_return = self._check_loop_body_for_exit(line_num, parsed_data)
+            if not has_break_or_return:
+                self.error_reporter.add_numeric_error(
+                    line_num,
+                    f"for循环条件 '{condition}' 恒定为真且循环体内无退出语句，可能导致死循环",
+                    "建议添加break语句或修改循环条件",
+                    line_content
+                )
     
     def _check_do_while_loop(self, line_content: str, line_num: int, parsed_data: Dict[str, List]):
         """检查do-while循环"""
@@ -186,54 +233,14 @@ class NumericControlFlowModule:
             )
     
     def _is_constant_true_condition(self, condition: str) -> bool:
-        """检查条件是否恒定为真"""
-        condition = condition.strip()
-        
-        # 检查常见的恒定为真条件
-        constant_true_conditions = [
-            '1',
-            'true',
-            '!0',
-            '!NULL',
-            '!0',
-            '1==1',
-            '1!=0',
-        ]
-        
-        if condition in constant_true_conditions:
-            return True
-        
-        # 检查while(1)模式
-        if condition == '1':
-            return True
-        
-        # 检查while(true)模式
-        if condition == 'true':
-            return True
-        
-        return False
+        """检查条件是否恒定为真（调用方已去除首尾空白）"""
+        return condition in CONSTANT_TRUE_CONDITIONS
     
     def _check_loop_body_for_exit(self, loop_line: int, parsed_data: Dict[str, List]) -> bool:
         """检查循环体内是否有退出语句"""
-        # 简化的检查：查找循环体中的break或return语句
-        # 这里假设循环体在接下来的几行中
-        for i in range(loop_line, min(loop_line + 20, len(parsed_data['lines']))):
-            if i < len(parsed_data['lines']):
-                line_content = parsed_data['lines'][i]
-                
-                # 检查break语句
-                if self.patterns['break_statement'].search(line_content):
-                    return True
-                
-                # 检查return语句
-                if self.patterns['return_statement'].search(line_content):
-                    return True
-                
-                # 如果遇到右大括号，说明循环体结束
-                if '}' in line_content:
-                    break
-        
-        return False
+        # 循环体为循环所在行到与其左大括号配对的右大括号所在行（未闭合时到文件末尾）
+        end_line = self.brace_close.get(loop_line, len(parsed_data['lines']))
+        return self.exit_counts[end_line] > self.exit_counts[loop_line - 1]
     
     def get_module_name(self) -> str:
         """获取模块名称"""
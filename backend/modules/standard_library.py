@@ -2,11 +2,185 @@
 标准库使用助手模块 - 检测缺失头文件、头文件拼写错误，检查常用函数参数
 """
 import re
-from typing import Dict, List, Set
+import functools
+from typing import Dict, List, Set, Optional
 from utils.error_reporter import ErrorReporter
 from utils.code_parser import CCodeParser
 
 
+# printf格式说明符中%后面的转换字符（%%输出百分号，不消耗参数，单独处理）
+FORMAT_CONVERSION_CHARS = frozenset('diouxXeEfFgGaAcspn')
+
+# 转换字符之前可能出现的标志、宽度/精度和长度修饰符字符
+FORMAT_FLAG_CHARS = frozenset('-+ #0')
+FORMAT_WIDTH_CHARS = frozenset('0123456789.*')
+FORMAT_LENGTH_CHARS = frozenset('hlLqjzt')
+
+# scanf参数中不是变量的标识符
+SCANF_NON_VARIABLES = frozenset([
+    'scanf', 'printf', 'int', 'char', 'float', 'double', 'long', 'short', 'unsigned', 'signed',
+])
+
+# 标准库函数和对应头文件的映射
+FUNCTION_HEADERS = {
+    # stdio.h
+    'printf': 'stdio.h',
+    'scanf': 'stdio.h',
+    'fprintf': 'stdio.h',
+    'fscanf': 'stdio.h',
+    'sprintf': 'stdio.h',
+    'sscanf': 'stdio.h',
+    'fopen': 'stdio.h',
+    'fclose': 'stdio.h',
+    'fread': 'stdio.h',
+    'fwrite': 'stdio.h',
+    'fgets': 'stdio.h',
+    'fputs': 'stdio.h',
+    'getchar': 'stdio.h',
+    'putchar': 'stdio.h',
+    'gets': 'stdio.h',
+    'puts': 'stdio.h',
+    'perror': 'stdio.h',
+    'feof': 'stdio.h',
+    'ferror': 'stdio.h',
+    'clearerr': 'stdio.h',
+    'rewind': 'stdio.h',
+    'fseek': 'stdio.h',
+    'ftell': 'stdio.h',
+    'fgetpos': 'stdio.h',
+    'fsetpos': 'stdio.h',
+    
+    # stdlib.h
+    'malloc': 'stdlib.h',
+    'free': 'stdlib.h',
+    'calloc': 'stdlib.h',
+    'realloc': 'stdlib.h',
+    'exit': 'stdlib.h',
+    'abort': 'stdlib.h',
+    'atexit': 'stdlib.h',
+    'system': 'stdlib.h',
+    'getenv': 'stdlib.h',
+    'putenv': 'stdlib.h',
+    'rand': 'stdlib.h',
+    'srand': 'stdlib.h',
+    'atoi': 'stdlib.h',
+    'atol': 'stdlib.h',
+    'atof': 'stdlib.h',
+    'strtol': 'stdlib.h',
+    'strtoul': 'stdlib.h',
+    'strtod': 'stdlib.h',
+    'qsort': 'stdlib.h',
+    'bsearch': 'stdlib.h',
+    'abs': 'stdlib.h',
+    'labs': 'stdlib.h',
+    'div': 'stdlib.h',
+    'ldiv': 'stdlib.h',
+    
+    # string.h
+    'strlen': 'string.h',
+    'strcpy': 'string.h',
+    'strncpy': 'string.h',
+    'strcat': 'string.h',
+    'strncat': 'string.h',
+    'strcmp': 'string.h',
+    'strncmp': 'string.h',
+    'strchr': 'string.h',
+    'strrchr': 'string.h',
+    'strstr': 'string.h',
+    'strtok': 'string.h',
+    'strspn': 'string.h',
+    'strcspn': 'string.h',
+    'strpbrk': 'string.h',
+    'memcpy': 'string.h',
+    'memmove': 'string.h',
+    'memcmp': 'string.h',
+    'memchr': 'string.h',
+    'memset': 'string.h',
+    'strerror': 'string.h',
+    
+    # math.h
+    'sin': 'math.h',
+    'cos': 'math.h',
+    'tan': 'math.h',
+    'asin': 'math.h',
+    'acos': 'math.h',
+    'atan': 'math.h',
+    'atan2': 'math.h',
+    'sinh': 'math.h',
+    'cosh': 'math.h',
+    'tanh': 'math.h',
+    'exp': 'math.h',
+    'log': 'math.h',
+    'log10': 'math.h',
+    'pow': 'math.h',
+    'sqrt': 'math.h',
+    'ceil': 'math.h',
+    'floor': 'math.h',
+    'fabs': 'math.h',
+    'fmod': 'math.h',
+    'frexp': 'math.h',
+    'ldexp': 'math.h',
+    'modf': 'math.h',
+    
+    # ctype.h
+    'isalpha': 'ctype.h',
+    'isdigit': 'ctype.h',
+    'isalnum': 'ctype.h',
+    'isspace': 'ctype.h',
+    'isupper': 'ctype.h',
+    'islower': 'ctype.h',
+    'toupper': 'ctype.h',
+    'tolower': 'ctype.h',
+    'ispunct': 'ctype.h',
+    'isprint': 'ctype.h',
+    'iscntrl': 'ctype.h',
+    'isgraph': 'ctype.h',
+    'isxdigit': 'ctype.h',
+    
+    # time.h
+    'time': 'time.h',
+    'clock': 'time.h',
+    'difftime': 'time.h',
+    'mktime': 'time.h',
+    'asctime': 'time.h',
+    'ctime': 'time.h',
+    'gmtime': 'time.h',
+    'localtime': 'time.h',
+    'strftime': 'time.h',
+}
+
+# C标准库头文件（常用的排在前面，拼写纠正有多个候选时优先给出）
+STANDARD_HEADERS = (
+    'stdio.h', 'stdlib.h', 'string.h', 'math.h', 'ctype.h', 'time.h',
+    'assert.h', 'errno.h', 'limits.h', 'float.h', 'stddef.h', 'stdarg.h',
+    'stdbool.h', 'stdint.h', 'inttypes.h', 'signal.h', 'setjmp.h', 'locale.h',
+    'wchar.h', 'wctype.h', 'complex.h', 'fenv.h', 'iso646.h', 'tgmath.h',
+    'uchar.h', 'threads.h', 'stdatomic.h', 'stdalign.h', 'stdnoreturn.h',
+)
+
+STANDARD_HEADER_SET = frozenset(STANDARD_HEADERS)
+
+# 常见的POSIX及平台头文件，不是拼写错误，但也不作为拼写纠正的候选
+PLATFORM_HEADERS = frozenset([
+    'unistd.h', 'strings.h', 'fcntl.h', 'pthread.h', 'semaphore.h', 'sched.h',
+    'dirent.h', 'libgen.h', 'regex.h', 'glob.h', 'fnmatch.h', 'getopt.h',
+    'termios.h', 'poll.h', 'dlfcn.h', 'syslog.h', 'pwd.h', 'grp.h', 'utime.h',
+    'netdb.h', 'netinet/in.h', 'arpa/inet.h',
+    'sys/types.h', 'sys/stat.h', 'sys/wait.h', 'sys/time.h', 'sys/socket.h',
+    'sys/mman.h', 'sys/ioctl.h', 'sys/select.h', 'sys/resource.h', 'sys/un.h',
+    'malloc.h', 'memory.h', 'alloca.h', 'conio.h', 'windows.h',
+])
+
+# 已知的合法头文件，命中时直接跳过拼写检查
+KNOWN_HEADER_SET = STANDARD_HEADER_SET | PLATFORM_HEADERS
+
+# 按长度分桶，编辑距离为1的候选只需在长度相差不超过1的桶中查找
+STANDARD_HEADERS_BY_LENGTH = {
+    length: tuple(header for header in STANDARD_HEADERS if len(header) == length)
+    for length in {len(header) for header in STANDARD_HEADERS}
+}
+
+
 class StandardLibraryModule:
     """标准库使用助手模块"""
     
@@ -14,150 +188,15 @@ class StandardLibraryModule:
         self.error_reporter = ErrorReporter()
         self.parser = CCodeParser()
         
-        # 标准库函数和对应头文件的映射
-        self.function_headers = {
-            # stdio.h
-            'printf': 'stdio.h',
-            'scanf': 'stdio.h',
-            'fprintf': 'stdio.h',
-            'fscanf': 'stdio.h',
-            'sprintf': 'stdio.h',
-            'sscanf': 'stdio.h',
-            'fopen': 'stdio.h',
-            'fclose': 'stdio.h',
-            'fread': 'stdio.h',
-            'fwrite': 'stdio.h',
-            'fgets': 'stdio.h',
-            'fputs': 'stdio.h',
-            'getchar': 'stdio.h',
-            'putchar': 'stdio.h',
-            'gets': 'stdio.h',
-            'puts': 'stdio.h',
-            'perror': 'stdio.h',
-            'feof': 'stdio.h',
-            'ferror': 'stdio.h',
-            'clearerr': 'stdio.h',
-            'rewind': 'stdio.h',
-            'fseek': 'stdio.h',
-            'ftell': 'stdio.h',
-            'fgetpos': 'stdio.h',
-            'fsetpos': 'stdio.h',
-            
-            # stdlib.h
-            'malloc': 'stdlib.h',
-            'free': 'stdlib.h',
-            'calloc': 'stdlib.h',
-            'realloc': 'stdlib.h',
-            'exit': 'stdlib.h',
-            'abort': 'stdlib.h',
-            'atexit': 'stdlib.h',
-            'system': 'stdlib.h',
-            'getenv': 'stdlib.h',
-            'putenv': 'stdlib.h',
-            'rand': 'stdlib.h',
-            'srand': 'stdlib.h',
-            'atoi': 'stdlib.h',
-            'atol': 'stdlib.h',
-            'atof': 'stdlib.h',
-            'strtol': 'stdlib.h',
-            'strtoul': 'stdlib.h',
-            'strtod': 'stdlib.h',
-            'qsort': 'stdlib.h',
-            'bsearch': 'stdlib.h',
-            'abs': 'stdlib.h',
-            'labs': 'stdlib.h',
-            'div': 'stdlib.h',
-            'ldiv': 'stdlib.h',
-            
-            # string.h
-            'strlen': 'string.h',
-            'strcpy': 'string.h',
-            'strncpy': 'string.h',
-            'strcat': 'string.h',
-            'strncat': 'string.h',
-            'strcmp': 'string.h',
-            'strncmp': 'string.h',
-            'strchr': 'string.h',
-            'strrchr': 'string.h',
-            'strstr': 'string.h',
-            'strtok': 'string.h',
-            'strspn': 'string.h',
-            'strcspn': 'string.h',
-            'strpbrk': 'string.h',
-            'memcpy': 'string.h',
-            'memmove': 'string.h',
-            'memcmp': 'string.h',
-            'memchr': 'string.h',
-            'memset': 'string.h',
-            'strerror': 'string.h',
-            
-            # math.h
-            'sin': 'math.h',
-            'cos': 'math.h',
-            'tan': 'math.h',
-            'asin': 'math.h',
-            'acos': 'math.h',
-            'atan': 'math.h',
-            'atan2': 'math.h',
-            'sinh': 'math.h',
-            'cosh': 'math.h',
-            'tanh': 'math.h',
-            'exp': 'math.h',
-            'log': 'math.h',
-            'log10': 'math.h',
-            'pow': 'math.h',
-            'sqrt': 'math.h',
-            'ceil': 'math.h',
-            'floor': 'math.h',
-            'fabs': 'math.h',
-            'fmod': 'math.h',
-            'frexp': 'math.h',
-            'ldexp': 'math.h',
-            'modf': 'math.h',
-            
-            # ctype.h
-            'isalpha': 'ctype.h',
-            'isdigit': 'ctype.h',
-            'isalnum': 'ctype.h',
-            'isspace': 'ctype.h',
-            'isupper': 'ctype.h',
-            'islower': 'ctype.h',
-            'toupper': 'ctype.h',
-            'tolower': 'ctype.h',
-            'ispunct': 'ctype.h',
-            'isprint': 'ctype.h',
-            'iscntrl': 'ctype.h',
-            'isgraph': 'ctype.h',
-            'isxdigit': 'ctype.h',
-            
-            # time.h
-            'time': 'time.h',
-            'clock': 'time.h',
-            'difftime': 'time.h',
-            'mktime': 'time.h',
-            'asctime': 'time.h',
-            'ctime': 'time.h',
-            'gmtime': 'time.h',
-            'localtime': 'time.h',
-            'strftime': 'time.h',
-        }
-        
-        # 常见头文件拼写错误
-        self.common_header_misspellings = {
-            'stdio.h': ['studio.h', 'stdi.h', 'stdio'],
-            'stdlib.h': ['stdli.h', 'stdlib'],
-            'string.h': ['strng.h', 'string'],
-            'math.h': ['mat.h', 'math'],
-            'ctype.h': ['ctyp.h', 'ctype'],
-            'time.h': ['tim.h', 'time'],
-        }
-        
         # 编译正则表达式模式
         self.patterns = {
             'scanf_params': re.compile(r'\bscanf\s*\([^)]*\)', re.MULTILINE),
-            'printf_params': re.compile(r'\bprintf\s*\([^)]*\)', re.MULTILINE),
-            'function_call': re.compile(r'\b(\w+)\s*\([^)]*\)', re.MULTILINE),
-            'include': re.compile(r'#include\s*[<"]([^>"]+)[>"]', re.MULTILINE),
+            # printf调用的开头，参数列表的结束位置由_find_closing_paren确定
+            'printf_call': re.compile(r'\bprintf\s*\('),
+            # scanf参数：跳过字符串字面量，标识符连同前面可能的&一起捕获
+            'scanf_argument': re.compile(r'"(?:\\.|[^"\\\n])*"|(&\s*)?\b([a-zA-Z_][a-zA-Z0-9_]*)\b'),
+            # printf开头的格式字符串（允许相邻字符串字面量拼接）
+            'format_string': re.compile(r'\s*(?:"(?:\\.|[^"\\\n])*"\s*)+'),
         }
     
     def analyze(self, parsed_data: Dict[str, List]) -> List:
@@ -174,24 +213,20 @@ class StandardLibraryModule:
     def _detect_missing_headers(self, parsed_data: Dict[str, List]):
         """检测缺失的头文件"""
         # 获取所有包含的头文件
-        included_headers = set()
-        for include in parsed_data['includes']:
-            included_headers.add(include['header'])
+        included_headers = {include['header'] for include in parsed_data['includes']}
         
-        # 检查函数调用
+        # 检查函数调用（一次字典查找同时判断是否为标准库函数并取得所需头文件）
+        function_headers = FUNCTION_HEADERS
         for func_call in parsed_data['function_calls']:
             func_name = func_call['name']
-            line_num = func_call['line']
-            
-            if func_name in self.function_headers:
-                required_header = self.function_headers[func_name]
-                if required_header not in included_headers:
-                    self.error_reporter.add_library_error(
-                        line_num,
-                        f"使用函数 '{func_name}' 但未包含必要的头文件 '{required_header}'",
-                        f"建议在文件开头添加：#include <{required_header}>",
-                        func_call['line_content']
-                    )
+            required_header = function_headers.get(func_name)
+            if required_header is not None and required_header not in included_headers:
+                self.error_reporter.add_library_error(
+                    func_call['line'],
+                    f"使用函数 '{func_name}' 但未包含必要的头文件 '{required_header}'",
+                    f"建议在文件开头添加：#include <{required_header}>",
+                    func_call['line_content']
+                )
     
     def _detect_header_misspellings(self, parsed_data: Dict[str, List]):
         """检测头文件拼写错误"""
@@ -199,16 +234,15 @@ class StandardLibraryModule:
             header = include['header']
             line_num = include['line']
             
-            # 检查常见拼写错误
-            for correct_header, misspellings in self.common_header_misspellings.items():
-                if header in misspellings:
-                    self.error_reporter.add_library_error(
-                        line_num,
-                        f"头文件 '{header}' 拼写错误",
-                        f"建议修正为：#include <{correct_header}>",
-                        include['line_content']
-                    )
-                    break
+            # 检查是否为某个标准头文件的拼写错误
+            correct_header = self._suggest_header(header, include['is_system'])
+            if correct_header is not None:
+                self.error_reporter.add_library_error(
+                    line_num,
+                    f"头文件 '{header}' 拼写错误",
+                    f"建议修正为：#include <{correct_header}>",
+                    include['line_content']
+                )
     
     def _detect_function_parameter_issues(self, parsed_data: Dict[str, List]):
         """检测函数参数问题"""
@@ -237,52 +271,197 @@ class StandardLibraryModule:
             
             # 检查参数中是否有&符号
             # 简单的启发式检查：如果参数包含变量名但没有&，可能是错误
-            var_matches = re.findall(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\b', params)
-            for var_name in var_matches:
-                if var_name not in ['scanf', 'printf', 'int', 'char', 'float', 'double', 'long', 'short', 'unsigned', 'signed']:
-                    # 检查变量前是否有&
-                    var_pattern = rf'\b{var_name}\b'
-                    if re.search(var_pattern, params) and '&' + var_name not in params:
-                        self.error_reporter.add_library_error(
-                            line_num,
-                            f"scanf中变量 '{var_name}' 缺少地址运算符 &",
-                            f"建议修正为：scanf(\"...\", &{var_name});",
-                            line_content
-                        )
-    
-    def _check_printf_parameters(self, line_content: str, line_num: int):
-        """检查printf参数"""
-        # 提取printf的参数
-        printf_match = self.patterns['printf_params'].search(line_content)
-        if printf_match:
-            params = printf_match.group(0)
-            
-            # 检查格式字符串和参数数量是否匹配
-            # 这是一个简化的检查，实际实现会更复杂
-            format_strings = re.findall(r'%[diouxXeEfFgGaAcspn%]', params)
-            
-            # 提取参数部分（括号内的内容）
-            param_match = re.search(r'printf\s*\(([^)]+)\)', params)
-            if param_match:
-                param_content = param_match.group(1)
-                # 计算参数数量（排除格式字符串）
-                # 简单计算：逗号分隔的参数数量
-                if format_strings:
-                    # 有格式字符串，计算逗号数量
-                    comma_count = param_content.count(',')
-                    param_count = comma_count
-                else:
-                    # 没有格式字符串，检查是否有参数
-                    param_count = 1 if param_content.strip() and param_content.strip() != '""' else 0
-                
-                if len(format_strings) != param_count:
+            # 一次扫描同时得到每个标识符及其前面是否有&，格式字符串中的内容不会被当作变量
+            for address_of, var_name in self.patterns['scanf_argument'].findall(params):
+                if var_name and not address_of and var_name not in SCANF_NON_VARIABLES:
                     self.error_reporter.add_library_error(
                         line_num,
-                        f"printf格式字符串数量({len(format_strings)})与参数数量({param_count})不匹配",
-                        "建议检查格式字符串和参数数量是否一致",
+                        f"scanf中变量 '{var_name}' 缺少地址运算符 &",
+                        f"建议修正为：scanf(\"...\", &{var_name});",
                         line_content
                     )
     
+    def _check_printf_parameters(self, line_content: str, line_num: int):
+        """检查printf参数"""
+        # 提取printf的参数（到与左括号配对的右括号为止，参数中的嵌套调用和类型转换不会截断参数列表）
+        printf_match = self.patterns['printf_call'].search(line_content)
+        if not printf_match:
+            return
+        
+        param_end = self._find_closing_paren(line_content, printf_match.end())
+        if param_end is None:
+            return
+        
+        param_content = line_content[printf_match.end():param_end]
+        if not param_content:
+            return
+        
+        # 格式串不是字符串字面量（如 printf(buf)）时无法检查，直接跳过
+        format_match = self.patterns['format_string'].match(param_content)
+        if not format_match:
+            return
+        
+        format_string = format_match.group(0)
+        arguments = param_content[format_match.end():]
+        
+        # 格式串后接宏（如 "%" PRId64 "\n"）时格式串并非完整的字面量，同样无法检查
+        if arguments and not arguments.startswith(','):
+            return
+        
+        # 最常见的 printf("纯文本\n") 既无说明符也无参数，不必继续统计
+        if '%' not in format_string and not arguments.strip():
+            return
+        
+        # 格式说明符只在格式字符串中统计，实际参数为格式字符串之后逗号分隔的各项
+        format_count = self._count_format_specifiers(format_string) if '%' in format_string else 0
+        param_count = len(self._split_arguments(arguments))
+        
+        if format_count != param_count:
+            self.error_reporter.add_library_error(
+                line_num,
+                f"printf格式字符串数量({format_count})与参数数量({param_count})不匹配",
+                "建议检查格式字符串和参数数量是否一致",
+                line_content
+            )
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _suggest_header(header: str, is_system: bool) -> Optional[str]:
+        """返回与头文件名最接近的标准头文件，不像拼写错误时返回None"""
+        # 已知的头文件，绝大多数include在这里直接返回
+        if header in KNOWN_HEADER_SET:
+            return None
+        
+        # 漏写了.h后缀
+        if header + '.h' in STANDARD_HEADER_SET:
+            return header + '.h'
+        
+        # "..."包含的是项目头文件（如 "path.h"），与标准头文件相近也不算拼写错误
+        if not is_system:
+            return None
+        
+        # 只和长度相差不超过1的标准头文件比较编辑距离
+        length = len(header)
+        for candidate_length in (length, length - 1, length + 1):
+            for candidate in STANDARD_HEADERS_BY_LENGTH.get(candidate_length, ()):
+                if StandardLibraryModule._is_one_edit_away(header, candidate):
+                    return candidate
+        return None
+    
+    @staticmethod
+    def _is_one_edit_away(word: str, candidate: str) -> bool:
+        """判断两个不同的字符串是否只差一次插入、删除、替换或相邻字符互换"""
+        if len(word) == len(candidate):
+            diffs = [i for i in range(len(word)) if word[i] != candidate[i]]
+            if len(diffs) == 1:
+                return True
+            return (len(diffs) == 2 and diffs[1] == diffs[0] + 1
+                    and word[diffs[0]] == candidate[diffs[1]]
+                    and word[diffs[1]] == candidate[diffs[0]])
+        
+        # 长度相差1：跳过第一个不同的字符后剩余部分应完全相同
+        longer, shorter = (word, candidate) if len(word) > len(candidate) else (candidate, word)
+        i = 0
+        while i < len(shorter) and longer[i] == shorter[i]:
+            i += 1
+        return longer[i + 1:] == shorter[i:]
+    
+    @staticmethod
+    def _find_closing_paren(text: str, start: int) -> Optional[int]:
+        """从左括号之后的start开始，返回与之配对的右括号位置（跳过字面量中的括号），未闭合时返回None"""
+        depth = 0
+        quote = None
+        escaped = False
+        for i in range(start, len(text)):
+            char = text[i]
+            if quote:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == quote:
+                    quote = None
+            elif char == '"' or char == "'":
+                quote = char
+            elif char == '(':
+                depth += 1
+            elif char == ')':
+                if depth == 0:
+                    return i
+                depth -= 1
+        return None
+    
+    @staticmethod
+    def _split_arguments(arguments: str) -> List[str]:
+        """按顶层逗号拆分格式字符串之后的参数列表"""
+        arguments = arguments.strip()
+        if arguments.startswith(','):
+            arguments = arguments[1:]
+        
+        # 常见情况：参数中没有括号、下标和字面量，逗号都在顶层，直接split
+        if '(' not in arguments and '[' not in arguments and '"' not in arguments and "'" not in arguments:
+            return [param.strip() for param in arguments.split(',') if param.strip()]
+        
+        # 否则逐字符扫描，跳过嵌套括号和字面量中的逗号，按位置切片取出每个参数
+        params = []
+        start = 0
+        depth = 0
+        quote = None
+        escaped = False
+        for i, char in enumerate(arguments):
+            if quote:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == quote:
+                    quote = None
+            elif char == '"' or char == "'":
+                quote = char
+            elif char == '(' or char == '[':
+                depth += 1
+            elif char == ')' or char == ']':
+                depth -= 1
+            elif char == ',' and depth == 0:
+                param = arguments[start:i].strip()
+                if param:
+                    params.append(param)
+                start = i + 1
+        
+        param = arguments[start:].strip()
+        if param:
+            params.append(param)
+        return params
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _count_format_specifiers(params: str) -> int:
+        """统计格式说明符需要的参数数量（按原始文本缓存，重复的打印语句无需重复扫描）"""
+        # 逐字符扫描%[标志][宽度][.精度][长度]转换字符，支持%-5.2f、%03d、%ld等写法
+        count = 0
+        length = len(params)
+        pos = params.find('%')
+        while pos != -1:
+            i = pos + 1
+            if params[i:i + 1] == '%':
+                pos = params.find('%', i + 1)
+                continue
+            while i < length and params[i] in FORMAT_FLAG_CHARS:
+                i += 1
+            # 宽度或精度写作*时额外消耗一个参数
+            star_count = 0
+            while i < length and params[i] in FORMAT_WIDTH_CHARS:
+                if params[i] == '*':
+                    star_count += 1
+                i += 1
+            while i < length and params[i] in FORMAT_LENGTH_CHARS:
+                i += 1
+            if i < length and params[i] in FORMAT_CONVERSION_CHARS:
+                count += 1 + star_count
+                i += 1
+            pos = params.find('%', i)
+        return count
+    
     def get_module_name(self) -> str:
         """获取模块名称"""
         return "标准库使用助手"
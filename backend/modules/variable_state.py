@@ -7,6 +7,25 @@ from utils.error_reporter import ErrorReporter
 from utils.code_parser import CCodeParser, VariableInfo
 
 
+# 不检查参数初始化状态的标准库函数
+UNCHECKED_FUNCTIONS = frozenset(['printf', 'scanf', 'malloc', 'free', 'strlen', 'strcpy', 'strcmp'])
+
+# 变量后紧跟的运算符 -> 使用类别
+USAGE_OPERATOR_CATEGORIES = {
+    '<': 'comparison', '>': 'comparison', '=': 'comparison', '!': 'comparison',
+    '+': 'arithmetic', '-': 'arithmetic', '*': 'arithmetic', '/': 'arithmetic',
+}
+
+# 使用类别 -> (问题描述, 修改建议)
+UNINITIALIZED_USAGE_MESSAGES = {
+    'array': ("数组 '{name}' 在初始化前被访问", "建议在使用前初始化数组：{name}[0] = 初始值;"),
+    'pointer_arithmetic': ("指针 '{name}' 在初始化前进行运算",
+                           "建议在使用前初始化指针：{name} = NULL; 或 {name} = malloc(size);"),
+    'comparison': ("变量 '{name}' 在初始化前进行比较", "建议在使用前初始化变量：{name} = 初始值;"),
+    'arithmetic': ("变量 '{name}' 在初始化前进行算术运算", "建议在使用前初始化变量：{name} = 初始值;"),
+}
+
+
 class VariableStateModule:
     """变量状态监察官模块"""
     
@@ -19,15 +38,21 @@ class VariableStateModule:
         self.scope_stack: List[int] = [0]  # 作用域栈
         self.current_scope: int = 0
         
+        # 每行的分类：'blank'（空行/注释）、'declaration'（变量声明）、'code'
+        self.line_kinds: List[str] = []
+        
         # 编译正则表达式模式
         self.patterns = {
-            'variable_use': re.compile(r'\b(\w+)\b', re.MULTILINE),
+            'identifier': re.compile(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\b'),
             'assignment': re.compile(r'\b(\w+)\s*=\s*([^;]+);', re.MULTILINE),
-            'function_call': re.compile(r'\b(\w+)\s*\([^)]*\)', re.MULTILINE),
-            'array_access': re.compile(r'\b(\w+)\s*\[[^\]]+\]', re.MULTILINE),
-            'pointer_arithmetic': re.compile(r'\b(\w+)\s*[+\-]\s*\d+', re.MULTILINE),
-            'comparison': re.compile(r'\b(\w+)\s*[<>=!]+\s*[^;]+', re.MULTILINE),
-            'arithmetic': re.compile(r'\b(\w+)\s*[+\-*/]\s*[^;]+', re.MULTILINE),
+            'function_call': re.compile(r'\b(\w+)\s*\(([^)]*)\)', re.MULTILINE),
+            # 变量后紧跟[（数组访问）或运算符（比较、算术，+/-后跟数字时还是指针运算），一次扫描全部识别
+            'variable_usage': re.compile(
+                r'\b(?P<name>\w+)\s*'
+                r'(?:\[(?=[^\]]+\])'
+                r'|(?P<op>[<>=!+\-*/])(?=[^;])(?P<offset>(?<=[+\-])\s*\d+)?)'
+            ),
+            'declaration': re.compile(r'\b(int|char|float|double|long|short|unsigned|signed|void|struct\s+\w+)\s+(\w+)', re.MULTILINE),
         }
     
     def analyze(self, parsed_data: Dict[str, List]) -> List:
@@ -39,12 +64,27 @@ class VariableStateModule:
         self.scope_stack = [0]
         self.current_scope = 0
         
+        # 一次遍历完成行分类，供各检测方法共享
+        self._classify_lines(parsed_data)
+        
         # 分析各种变量状态问题
         self._detect_uninitialized_variables(parsed_data)
         self._detect_scope_issues(parsed_data)
         
         return self.error_reporter.get_reports()
     
+    def _classify_lines(self, parsed_data: Dict[str, List]):
+        """对所有行进行分类"""
+        self.line_kinds = []
+        for line_content, stripped in zip(parsed_data['lines'], parsed_data['stripped_lines']):
+            if not stripped or stripped.startswith('//') or stripped.startswith('/*'):
+                self.line_kinds.append('blank')
+            elif ';' in line_content and ('int ' in line_content or 'char ' in line_content or
+                                         'float ' in line_content or 'double ' in line_content):
+                self.line_kinds.append('declaration')
+            else:
+                self.line_kinds.append('code')
+    
     def _detect_uninitialized_variables(self, parsed_data: Dict[str, List]):
         """检测未初始化变量使用"""
         # 首先记录所有变量声明
@@ -57,23 +97,15 @@ class VariableStateModule:
                 'last_assigned_line': var.line_number if var.is_initialized else None
             }
         
-        # 检查变量使用
-        for line_num, line_content in enumerate(parsed_data['lines'], 1):
-            self._check_variable_usage_in_line(line_content, line_num, parsed_data)
+        # 检查变量使用（跳过空行、注释和变量声明行）
+        for line_num, (line_content, line_kind) in enumerate(zip(parsed_data['lines'], self.line_kinds), 1):
+            if line_kind == 'code':
+                self._check_variable_usage_in_line(line_content, line_num, parsed_data)
     
     def _check_variable_usage_in_line(self, line_content: str, line_num: int, parsed_data: Dict[str, List]):
         """检查单行中的变量使用"""
-        # 跳过注释和空行
-        if line_content.strip().startswith('//') or line_content.strip().startswith('/*') or not line_content.strip():
-            return
-        
-        # 跳过变量声明行
-        if ';' in line_content and ('int ' in line_content or 'char ' in line_content or 
-                                   'float ' in line_content or 'double ' in line_content):
-            return
-        
-        # 检查赋值语句
-        assignment_matches = self.patterns['assignment'].findall(line_content)
+        # 检查赋值语句（各模式都要求行内出现特定字符，先用子串检查过滤）
+        assignment_matches = self.patterns['assignment'].findall(line_content) if '=' in line_content else []
         for var_name, value in assignment_matches:
             if var_name in self.variable_states:
                 # 更新变量状态
@@ -84,14 +116,11 @@ class VariableStateModule:
                 self._check_expression_variables(value, line_num)
         
         # 检查函数调用中的参数
-        func_call_matches = self.patterns['function_call'].findall(line_content)
-        for func_name in func_call_matches:
-            if func_name not in ['printf', 'scanf', 'malloc', 'free', 'strlen', 'strcpy', 'strcmp']:
-                # 提取函数参数
-                func_match = re.search(rf'\b{func_name}\s*\(([^)]+)\)', line_content)
-                if func_match:
-                    params = func_match.group(1)
-                    self._check_expression_variables(params, line_num)
+        func_matches = self.patterns['function_call'].finditer(line_content) if '(' in line_content else ()
+        for func_match in func_matches:
+            func_name, params = func_match.groups()
+            if func_name not in UNCHECKED_FUNCTIONS and params:
+                self._check_expression_variables(params, line_num)
         
         # 检查其他变量使用
         self._check_general_variable_usage(line_content, line_num)
@@ -99,11 +128,11 @@ class VariableStateModule:
     def _check_expression_variables(self, expression: str, line_num: int):
         """检查表达式中的变量"""
         # 提取表达式中的变量名
-        var_matches = re.findall(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\b', expression)
+        var_matches = self.patterns['identifier'].findall(expression)
         for var_name in var_matches:
-            if var_name in self.variable_states:
-                var_state = self.variable_states[var_name]
-                if not var_state['is_initialized']:
+            var_state = self.variable_states.get(var_name)
+            if var_state is not None:
+                if not var_state['is_initialized'] and self.error_reporter.first_report(line_num, var_name, 'used'):
                     self.error_reporter.add_variable_error(
                         line_num,
                         f"变量 '{var_name}' 在初始化前被使用",
@@ -113,57 +142,33 @@ class VariableStateModule:
     
     def _check_general_variable_usage(self, line_content: str, line_num: int):
         """检查一般变量使用"""
-        # 检查数组访问
-        array_matches = self.patterns['array_access'].findall(line_content)
-        for var_name in array_matches:
-            if var_name in self.variable_states:
-                var_state = self.variable_states[var_name]
-                if not var_state['is_initialized']:
-                    self.error_reporter.add_variable_error(
-                        line_num,
-                        f"数组 '{var_name}' 在初始化前被访问",
-                        f"建议在使用前初始化数组：{var_name}[0] = 初始值;",
-                        line_content
-                    )
-        
-        # 检查指针运算
-        ptr_matches = self.patterns['pointer_arithmetic'].findall(line_content)
-        for var_name in ptr_matches:
-            if var_name in self.variable_states:
-                var_state = self.variable_states[var_name]
-                if not var_state['is_initialized']:
-                    self.error_reporter.add_variable_error(
-                        line_num,
-                        f"指针 '{var_name}' 在初始化前进行运算",
-                        f"建议在使用前初始化指针：{var_name} = NULL; 或 {var_name} = malloc(size);",
-                        line_content
-                    )
-        
-        # 检查比较操作
-        comparison_matches = self.patterns['comparison'].findall(line_content)
-        for var_name in comparison_matches:
-            if var_name in self.variable_states:
-                var_state = self.variable_states[var_name]
-                if not var_state['is_initialized']:
-                    self.error_reporter.add_variable_error(
-                        line_num,
-                        f"变量 '{var_name}' 在初始化前进行比较",
-                        f"建议在使用前初始化变量：{var_name} = 初始值;",
-                        line_content
-                    )
-        
-        # 检查算术运算
-        arithmetic_matches = self.patterns['arithmetic'].findall(line_content)
-        for var_name in arithmetic_matches:
-            if var_name in self.variable_states:
-                var_state = self.variable_states[var_name]
-                if not var_state['is_initialized']:
-                    self.error_reporter.add_variable_error(
-                        line_num,
-                        f"变量 '{var_name}' 在初始化前进行算术运算",
-                        f"建议在使用前初始化变量：{var_name} = 初始值;",
-                        line_content
-                    )
+        # 数组访问、指针运算、比较和算术运算共用一次扫描，按变量后紧跟的符号分类
+        variable_states = self.variable_states
+        for match in self.patterns['variable_usage'].finditer(line_content):
+            var_name = match.group('name')
+            var_state = variable_states.get(var_name)
+            if var_state is None or var_state['is_initialized']:
+                continue
+            
+            op = match.group('op')
+            if op is None:
+                self._report_uninitialized_usage(line_num, var_name, 'array', line_content)
+                continue
+            
+            if match.group('offset') is not None:
+                self._report_uninitialized_usage(line_num, var_name, 'pointer_arithmetic', line_content)
+            self._report_uninitialized_usage(line_num, var_name, USAGE_OPERATOR_CATEGORIES[op], line_content)
+    
+    def _report_uninitialized_usage(self, line_num: int, var_name: str, category: str, line_content: str):
+        """报告变量在初始化前的某类使用"""
+        if self.error_reporter.first_report(line_num, var_name, category):
+            message, suggestion = UNINITIALIZED_USAGE_MESSAGES[category]
+            self.error_reporter.add_variable_error(
+                line_num,
+                message.format(name=var_name),
+                suggestion.format(name=var_name),
+                line_content
+            )
     
     def _detect_scope_issues(self, parsed_data: Dict[str, List]):
         """检测作用域问题"""
@@ -177,10 +182,9 @@ class VariableStateModule:
             brace_count -= line_content.count('}')
             
             # 检查变量声明
-            if ';' in line_content and ('int ' in line_content or 'char ' in line_content or 
-                                       'float ' in line_content or 'double ' in line_content):
+            if self.line_kinds[line_num - 1] == 'declaration':
                 # 提取变量名
-                var_match = re.search(r'\b(int|char|float|double|long|short|unsigned|signed|void|struct\s+\w+)\s+(\w+)', line_content)
+                var_match = self.patterns['declaration'].search(line_content)
                 if var_match:
                     var_name = var_match.group(2)
                     if var_name in self.variable_states:
@@ -0,0 +1,7 @@
+"""
+测试配置 - 将backend目录加入模块搜索路径
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,54 @@
+"""
+C代码解析器测试
+"""
+from utils.code_parser import CCodeParser
+
+
+def parse(source):
+    return CCodeParser().parse_content(source)
+
+
+def test_line_numbers_after_multiline_comment():
+    """多行注释移除后，后续代码的行号与源文件一致"""
+    source = '/* 第一行\n * 第二行\n */\nint main() {\n    printf("%d\\n", 1);\n}\n'
+    parsed = parse(source)
+    assert [call['line'] for call in parsed['printf_calls']] == [5]
+    assert parsed['functions'][0].line_number == 4
+
+
+def test_comment_markers_inside_string_literal_are_kept():
+    """字符串字面量中的//和/*不被当作注释"""
+    parsed = parse('char *url = "http://example.com/*x*/";\n')
+    assert parsed['lines'][0] == 'char *url = "http://example.com/*x*/";'
+
+
+def test_line_comment_is_removed():
+    """行尾注释中的代码不会被解析"""
+    parsed = parse('int x = 1; // printf("%d", x);\n')
+    assert parsed['printf_calls'] == []
+
+
+def test_free_records_bare_identifier_only():
+    """只有free(变量名)才记录被释放的变量"""
+    parsed = parse('free(ptr);\nfree( p );\nfree(n->data);\nfree(arr[i]);\n')
+    assert [call['variable'] for call in parsed['free_calls']] == ['ptr', 'p', None, None]
+
+
+def test_pointer_returning_function_definition():
+    """返回指针的函数定义能被识别，并得到函数体行范围"""
+    parsed = parse('int *make(int n) {\n    return 0;\n}\nchar* name(void) {\n    return 0;\n}\n')
+    assert [(func.name, func.return_type) for func in parsed['functions']] == [('make', 'int*'), ('name', 'char*')]
+    assert parsed['function_ranges'] == [('make', 1, 3), ('name', 4, 6)]
+
+
+def test_declaration_initialization_is_per_declaration():
+    """是否初始化只看本条声明，不受同一行其他赋值影响"""
+    parsed = parse('int x; y = 2;\nint z = 3;\n')
+    assert parsed['variables_by_name']['x'].is_initialized is False
+    assert parsed['variables_by_name']['z'].is_initialized is True
+
+
+def test_include_records_system_or_project_header():
+    """记录头文件是用<>还是""包含的"""
+    parsed = parse('#include <stdio.h>\n#include "util.h"\n')
+    assert [(inc['header'], inc['is_system']) for inc in parsed['includes']] == [('stdio.h', True), ('util.h', False)]
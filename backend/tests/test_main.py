@@ -0,0 +1,34 @@
+"""
+检测器主程序测试
+"""
+from main import CBugDetector
+
+
+SOURCE = (
+    '#include <stdio.h>\n'
+    'int main() {\n'
+    '    int x;\n'
+    '    printf("%d %d\\n", x);\n'
+    '    return 0;\n'
+    '}\n'
+)
+
+
+def test_text_report_of_parallel_analysis(tmp_path, capsys):
+    """多进程分析时，文本报告按子进程返回的报告生成"""
+    file_paths = []
+    for name in ('a.c', 'b.c'):
+        path = tmp_path / name
+        path.write_text(SOURCE, encoding='utf-8')
+        file_paths.append(str(path))
+    
+    detector = CBugDetector()
+    results = detector.analyze_files(file_paths, workers=2)
+    capsys.readouterr()
+    
+    assert sorted(results) == sorted(file_paths)
+    for reports in results.values():
+        text = detector.generate_report(reports, 'text')
+        assert f"共发现 {len(reports)} 个问题" in text
+        assert "printf格式字符串数量(2)与参数数量(1)不匹配" in text
+        assert "没有发现任何问题" not in text
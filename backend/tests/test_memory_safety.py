@@ -0,0 +1,78 @@
+"""
+内存安全卫士模块测试
+"""
+import pytest
+
+from utils.code_parser import CCodeParser
+from modules.memory_safety import MemorySafetyModule
+
+
+def analyze(source):
+    return MemorySafetyModule().analyze(CCodeParser().parse_content(source))
+
+
+def messages(reports):
+    return [(report.line_number, report.message) for report in reports]
+
+
+def test_use_after_free_is_reported():
+    """free(ptr)之后解引用ptr报告野指针，free之前的解引用不报告"""
+    source = (
+        'int main() {\n'
+        '    int *ptr = malloc(sizeof(int));\n'
+        '    *ptr = 1;\n'
+        '    free(ptr);\n'
+        '    *ptr = 2;\n'
+        '    return 0;\n'
+        '}\n'
+    )
+    use_after_free = [item for item in messages(analyze(source)) if '已被释放' in item[1]]
+    assert use_after_free == [(5, "指针 'ptr' 已被释放，但仍在被使用（野指针）")]
+
+
+def test_freeing_a_member_does_not_free_the_struct_pointer():
+    """free(n->data)不算释放n，之后解引用n不报告野指针"""
+    source = (
+        'void drop(struct node *n) {\n'
+        '    free(n->data);\n'
+        '    *n = empty;\n'
+        '}\n'
+    )
+    assert not any('已被释放' in message for _, message in messages(analyze(source)))
+
+
+def test_freeing_an_element_does_not_hide_leak():
+    """free(arr[i])不算释放arr，arr仍报告内存泄漏"""
+    source = (
+        'int main() {\n'
+        '    int *arr;\n'
+        '    arr = malloc(10);\n'
+        '    free(arr[0]);\n'
+        '    return 0;\n'
+        '}\n'
+    )
+    assert (2, "变量 'arr' 分配了内存但未释放，可能导致内存泄漏") in messages(analyze(source))
+
+
+@pytest.mark.parametrize('body, returned', [
+    ('    int local[4];\n', 'local'),
+    ('    int local[4];\n', '(int *)local'),
+    ('    int x = 1;\n', '&x'),
+])
+def test_return_local_pointer_is_reported(body, returned):
+    """返回局部数组名或局部变量地址时报告"""
+    source = 'int *make(void) {\n' + body + '    return ' + returned + ';\n}\n'
+    assert (3, "函数 'make' 返回局部指针，这是危险的") in messages(analyze(source))
+
+
+@pytest.mark.parametrize('body, returned', [
+    ('    char buf[4];\n', '(char *)malloc(n)'),
+    ('    char buf[4];\n', '(char *)0'),
+    ('    static char buf[8];\n', 'buf'),
+    ('    char *q = malloc(4);\n', 'q'),
+    ('    int n = 0;\n', 's'),
+])
+def test_return_non_local_pointer_is_not_reported(body, returned):
+    """返回动态分配的内存、空指针、静态变量、指针变量的值或参数时不报告"""
+    source = 'char *make(char *s) {\n' + body + '    return ' + returned + ';\n}\n'
+    assert not any('返回局部指针' in message for _, message in messages(analyze(source)))
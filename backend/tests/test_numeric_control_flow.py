@@ -0,0 +1,24 @@
+"""
+数值与控制流分析器模块测试
+"""
+import pytest
+
+from modules.numeric_control_flow import NumericControlFlowModule
+
+
+@pytest.mark.parametrize('expression, expected', [
+    ('300', 300),
+    ('-5', -5),
+    ('0x1B', 27),
+    ('010', 8),
+    ('1 << 3', 8),
+])
+def test_parse_c_numeric_values(expression, expected):
+    """十进制、十六进制、C八进制字面量和常量表达式可以求值"""
+    assert NumericControlFlowModule._parse_numeric_value(expression) == expected
+
+
+@pytest.mark.parametrize('expression', ['1_000', '0b11', '0o17', '0O17', 'x + 1'])
+def test_reject_non_c_numeric_values(expression):
+    """Python专有的数字写法和含变量的表达式不求值"""
+    assert NumericControlFlowModule._parse_numeric_value(expression) is None
@@ -0,0 +1,93 @@
+"""
+标准库使用助手模块测试
+"""
+import pytest
+
+from utils.code_parser import CCodeParser
+from modules.standard_library import StandardLibraryModule
+
+
+def analyze(source):
+    return StandardLibraryModule().analyze(CCodeParser().parse_content('#include <stdio.h>\n' + source))
+
+
+def messages(source):
+    return [report.message for report in analyze(source)]
+
+
+def test_scanf_reports_only_variables_without_address_of():
+    """格式串中的转换字符不被当作变量"""
+    assert messages('scanf("%d %d", &a, b);\n') == ["scanf中变量 'b' 缺少地址运算符 &"]
+
+
+@pytest.mark.parametrize('format_string, expected', [
+    ('"%d %s"', 2),
+    ('"100%%"', 0),
+    ('"%%d"', 0),
+    ('"plain text"', 0),
+])
+def test_percent_literal_is_not_a_specifier(format_string, expected):
+    """%%输出百分号，不计为格式说明符"""
+    assert StandardLibraryModule._count_format_specifiers(format_string) == expected
+
+
+@pytest.mark.parametrize('format_string, expected', [
+    ('"%-5.2f"', 1),
+    ('"%03d|%ld|%lld|%zu"', 4),
+    ('"%+d % d %#x"', 3),
+    ('"%*d"', 2),
+    ('"%.*f"', 2),
+])
+def test_specifier_flags_width_and_length(format_string, expected):
+    """标志、宽度、精度和长度修饰符都能识别，*宽度或精度额外消耗一个参数"""
+    assert StandardLibraryModule._count_format_specifiers(format_string) == expected
+
+
+@pytest.mark.parametrize('line', [
+    'printf("hello\\n");',
+    'printf("100%%\\n");',
+    'printf("%-5.2f\\n", value);',
+    'printf("a, %d\\n", x);',
+    'printf("%d\\n", max(a, b));',
+    'printf("sum=%d count=%d\\n", sum(values, 10), count);',
+    'printf("%d %d\\n", f(x), y);',
+    'printf("%d %d\\n", (int)a, b);',
+    'printf("(%d) [%s]\\n", x, name);',
+    'printf("%s %c\\n", "x,y", \',\');',
+    'printf("%" PRId64 "\\n", x);',
+    'printf("a" NAME "%d\\n", x);',
+    'printf(buf);',
+])
+def test_printf_without_mismatch(line):
+    """格式串中的逗号、嵌套调用和字面量中的逗号不算参数，后接宏的格式串跳过检查"""
+    assert messages(line + '\n') == []
+
+
+@pytest.mark.parametrize('line, format_count, param_count', [
+    ('printf("%d %d\\n", x);', 2, 1),
+    ('printf("%d\\n", f(x), y);', 1, 2),
+    ('printf("%d %d %d\\n", (int)a, g(b, c));', 3, 2),
+])
+def test_printf_mismatch_is_reported(line, format_count, param_count):
+    """说明符与参数数量不一致时报告，嵌套调用和类型转换各算一个参数"""
+    assert messages(line + '\n') == [f'printf格式字符串数量({format_count})与参数数量({param_count})不匹配']
+
+
+@pytest.mark.parametrize('include, expected', [
+    ('#include <studio.h>', 'stdio.h'),
+    ('#include <sdtio.h>', 'stdio.h'),
+    ('#include <limit.h>', 'limits.h'),
+    ('#include "stdio"', 'stdio.h'),
+    ('#include <strings.h>', None),
+    ('#include <uchar.h>', None),
+    ('#include <unistd.h>', None),
+    ('#include "path.h"', None),
+    ('#include "mach.h"', None),
+])
+def test_header_misspellings(include, expected):
+    """<>包含的头文件按编辑距离纠正，已知头文件和""包含的项目头文件不报告"""
+    suggestions = [report.suggestion for report in analyze(include + '\n') if '拼写错误' in report.message]
+    if expected is None:
+        assert suggestions == []
+    else:
+        assert suggestions == [f"建议修正为：#include <{expected}>"]
@@ -0,0 +1,44 @@
+"""
+变量状态监察官模块测试
+"""
+from utils.code_parser import CCodeParser
+from modules.variable_state import VariableStateModule
+
+
+def analyze(source):
+    return VariableStateModule().analyze(CCodeParser().parse_content(source))
+
+
+def test_reports_are_reset_between_files():
+    """再次分析时之前的去重记录已清空"""
+    module = VariableStateModule()
+    parsed = CCodeParser().parse_content('int main() {\n    int x;\n    if (x > 0) return 1;\n}\n')
+    first = len(module.analyze(parsed))
+    assert first > 0
+    assert len(module.analyze(parsed)) == first
+
+
+def test_every_operand_in_a_statement_is_checked():
+    """同一语句中后面的比较操作数也会被检查"""
+    source = (
+        'int main() {\n'
+        '    int x;\n'
+        '    int y;\n'
+        '    if (x > 0 && y < 5) return 1;\n'
+        '}\n'
+    )
+    reported = {(report.line_number, report.message) for report in analyze(source)}
+    assert (4, "变量 'x' 在初始化前进行比较") in reported
+    assert (4, "变量 'y' 在初始化前进行比较") in reported
+
+
+def test_same_issue_is_reported_once_per_line():
+    """同一行、同一变量的同类问题只报告一次"""
+    source = (
+        'int main() {\n'
+        '    int x;\n'
+        '    if (x > 0 || x < 5) return 1;\n'
+        '}\n'
+    )
+    comparisons = [report for report in analyze(source) if report.message == "变量 'x' 在初始化前进行比较"]
+    assert len(comparisons) == 1
@@ -2,10 +2,19 @@
 C代码解析器 - 使用正则表达式解析C代码
 """
 import re
+import sys
+import bisect
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 
 
+# 形如函数调用但不是函数名的关键字和类型名
+NON_FUNCTION_KEYWORDS = frozenset([
+    'int', 'char', 'float', 'double', 'long', 'short', 'unsigned', 'signed', 'void',
+    'if', 'while', 'for', 'do', 'return', 'break', 'continue',
+])
+
+
 @dataclass
 class VariableInfo:
     """变量信息"""
@@ -33,14 +42,11 @@ class CCodeParser:
     def __init__(self):
         # 编译常用的正则表达式模式
         self.patterns = {
-            # 变量声明
-            'variable_declaration': re.compile(r'\b(int|char|float|double|long|short|unsigned|signed|void|struct\s+\w+)\s+(\w+)(?:\s*=\s*[^;]+)?\s*;', re.MULTILINE),
-            
-            # 指针声明
-            'pointer_declaration': re.compile(r'\b(int|char|float|double|long|short|unsigned|signed|void|struct\s+\w+)\s*\*\s*(\w+)(?:\s*=\s*[^;]+)?\s*;', re.MULTILINE),
+            # 变量声明和指针声明（有*时为指针）
+            'declaration': re.compile(r'\b(?P<type>int|char|float|double|long|short|unsigned|signed|void|struct\s+\w+)(?:\s*(?P<pointer>\*)\s*|\s+)(?P<name>\w+)(?:\s*=\s*[^;]+)?\s*;', re.MULTILINE),
             
-            # 函数定义
-            'function_definition': re.compile(r'\b(int|char|float|double|long|short|unsigned|signed|void|struct\s+\w+)\s+(\w+)\s*\([^)]*\)\s*\{', re.MULTILINE),
+            # 函数定义（返回类型后可以带*，如 int *f(...)、char* f(...)）
+            'function_definition': re.compile(r'\b(?P<type>int|char|float|double|long|short|unsigned|signed|void|struct\s+\w+)(?:\s*(?P<pointer>\*+)\s*|\s+)(?P<name>\w+)\s*\([^)]*\)\s*\{', re.MULTILINE),
             
             # 函数调用
             'function_call': re.compile(r'\b(\w+)\s*\([^)]*\)', re.MULTILINE),
@@ -51,27 +57,34 @@ class CCodeParser:
             # 指针解引用
             'pointer_dereference': re.compile(r'\*(\w+)', re.MULTILINE),
             
-            # malloc/free调用
-            'malloc_call': re.compile(r'\b(\w+)\s*=\s*malloc\s*\([^)]+\)', re.MULTILINE),
-            'free_call': re.compile(r'\bfree\s*\([^)]+\)', re.MULTILINE),
-            
-            # scanf调用
-            'scanf_call': re.compile(r'\bscanf\s*\([^)]+\)', re.MULTILINE),
-            
-            # printf调用
-            'printf_call': re.compile(r'\bprintf\s*\([^)]+\)', re.MULTILINE),
+            # 语句类型组合模式：malloc/free、scanf/printf调用、循环结构、头文件包含
+            # 每行只需一次finditer，按命名分组分派
+            # free的参数只是单个变量名时才记录被释放的变量，free(n->data)、free(arr[i])不算释放n或arr
+            'statement': re.compile(
+                r'(?P<malloc_call>\b(?P<malloc_var>\w+)\s*=\s*malloc\s*\([^)]+\))'
+                r'|(?P<free_call>\bfree\s*\((?:\s*(?P<free_var>\w+)\s*\)|[^)]+\)))'
+                r'|(?P<scanf_call>\bscanf\s*\([^)]+\))'
+                r'|(?P<printf_call>\bprintf\s*\([^)]+\))'
+                r'|(?P<while_loop>\bwhile\s*\((?P<while_cond>[^)]+)\)\s*\{)'
+                r'|(?P<for_loop>\bfor\s*\((?P<for_cond>[^)]+)\)\s*\{)'
+                r'|(?P<do_while_loop>\bdo\s*\{)'
+                r'|(?P<include>#include\s*(?P<include_open>[<"])(?P<header>[^>"]+)[>"])',
+                re.MULTILINE
+            ),
             
-            # 循环结构
-            'while_loop': re.compile(r'\bwhile\s*\([^)]+\)\s*\{', re.MULTILINE),
-            'for_loop': re.compile(r'\bfor\s*\([^)]+\)\s*\{', re.MULTILINE),
-            'do_while_loop': re.compile(r'\bdo\s*\{', re.MULTILINE),
+            # 大括号
+            'brace': re.compile(r'[{}]'),
             
-            # 头文件包含
-            'include': re.compile(r'#include\s*[<"]([^>"]+)[>"]', re.MULTILINE),
+            # 字符串和字符字面量（统计大括号时排除）
+            'string_literal': re.compile(r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\''),
             
-            # 注释
-            'single_comment': re.compile(r'//.*$', re.MULTILINE),
-            'multi_comment': re.compile(r'/\*.*?\*/', re.DOTALL),
+            # 注释（同时匹配字符串和字符字面量，使字面量中的//和/*不被当作注释）
+            'comment': re.compile(
+                r'(?P<literal>"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\')'
+                r'|//[^\n]*'
+                r'|/\*.*?(?:\*/|\Z)',
+                re.DOTALL
+            ),
         }
     
     def parse_file(self, file_path: str) -> Dict[str, List]:
@@ -89,8 +102,9 @@ class CCodeParser:
         # 移除注释
         content = self._remove_comments(content)
         
-        # 按行分割
+        # 按行分割，并预先去除每行首尾空白（各处代码片段共用）
         lines = content.split('\n')
+        stripped_lines = [line.strip() for line in lines]
         
         result = {
             'variables': [],
@@ -104,155 +118,242 @@ class CCodeParser:
             'printf_calls': [],
             'loops': [],
             'includes': [],
-            'lines': lines
+            'lines': lines,
+            'stripped_lines': stripped_lines,
+            'source': content
         }
         
         # 解析各种结构
-        for line_num, line in enumerate(lines, 1):
-            self._parse_line(line, line_num, result)
+        for line_num, (line, line_content) in enumerate(zip(lines, stripped_lines), 1):
+            self._parse_line(line, line_num, result, line_content)
+        
+        # 按名称建立索引，同名时保留最先出现的
+        result['variables_by_name'] = {var.name: var for var in reversed(result['variables'])}
+        result['functions_by_name'] = {func.name: func for func in reversed(result['functions'])}
+        
+        # 按指针名索引解引用位置（保持出现顺序）
+        dereferences_by_pointer = {}
+        for deref in result['pointer_dereferences']:
+            dereferences_by_pointer.setdefault(deref['pointer'], []).append(deref)
+        result['dereferences_by_pointer'] = dereferences_by_pointer
+        
+        # 大括号配对和函数体行范围，供各模块共用
+        result['brace_pairs'] = self._build_brace_pairs(lines)
+        result['function_ranges'] = self._build_function_ranges(lines, result['functions'], result['brace_pairs'])
+        result['function_starts'] = [start_line for _, start_line, _ in result['function_ranges']]
         
         return result
     
+    def _build_brace_pairs(self, lines: List[str]) -> Dict[int, int]:
+        """一次扫描配对大括号（忽略字符串和字符字面量），返回 行号 -> 该行左大括号对应的右大括号所在行号"""
+        brace_pairs = {}
+        string_literal = self.patterns['string_literal']
+        brace_pattern = self.patterns['brace']
+        open_braces = []
+        for line_num, line in enumerate(lines, 1):
+            if '{' not in line and '}' not in line:
+                continue
+            
+            # 只有含引号的行才需要去掉字面量；之后只遍历大括号本身，而不是逐个字符
+            code = string_literal.sub('', line) if '"' in line or "'" in line else line
+            for ch in brace_pattern.findall(code):
+                if ch == '{':
+                    open_braces.append(line_num)
+                elif open_braces:
+                    # 同一行有多个左大括号时，最后闭合的是最外层的那个
+                    brace_pairs[open_braces.pop()] = line_num
+        
+        return brace_pairs
+    
+    def _build_function_ranges(self, lines: List[str], functions: List[FunctionInfo],
+                               brace_pairs: Dict[int, int]) -> List[Tuple[str, int, int]]:
+        """根据大括号配对得到每个函数的行范围 (函数名, 起始行, 结束行)，按起始行升序"""
+        func_starts = {}
+        for func in functions:
+            func_starts.setdefault(func.line_number, func.name)
+        
+        # 函数体未闭合时延伸到文件末尾
+        ranges = []
+        for start_line in sorted(func_starts):
+            ranges.append((func_starts[start_line], start_line, brace_pairs.get(start_line, len(lines))))
+        
+        return ranges
+    
     def _remove_comments(self, content: str) -> str:
         """移除注释"""
-        # 移除单行注释
-        content = self.patterns['single_comment'].sub('', content)
-        # 移除多行注释
-        content = self.patterns['multi_comment'].sub('', content)
-        return content
+        # 单次扫描同时处理单行和多行注释；多行注释只保留其中的换行，保证后续行号与源文件一致
+        return self.patterns['comment'].sub(self._replace_comment, content)
+    
+    @staticmethod
+    def _replace_comment(match) -> str:
+        """注释替换为空白，字符串和字符字面量原样保留"""
+        if match.group('literal'):
+            return match.group('literal')
+        newline_count = match.group(0).count('\n')
+        return '\n' * newline_count if newline_count else ' '
     
-    def _parse_line(self, line: str, line_num: int, result: Dict[str, List]):
+    def _parse_line(self, line: str, line_num: int, result: Dict[str, List], line_content: str):
         """解析单行代码"""
-        # 变量声明
-        var_matches = self.patterns['variable_declaration'].findall(line)
-        for var_type, var_name in var_matches:
-            result['variables'].append(VariableInfo(
-                name=var_name,
-                type=var_type,
-                line_number=line_num,
-                is_initialized='=' in line,
-                is_pointer=False
-            ))
+        # 每个模式都要求行内出现特定字符，先用子串检查过滤，避免无谓的正则匹配
+        has_semicolon = ';' in line
+        has_paren = '(' in line
+        has_brace = '{' in line
         
-        # 指针声明
-        ptr_matches = self.patterns['pointer_declaration'].findall(line)
-        for ptr_type, ptr_name in ptr_matches:
+        # 变量声明和指针声明（类型名和变量名在文件中大量重复，驻留后共享同一字符串对象）
+        # 是否初始化只看本条声明中变量名之后有没有=，而不是整行
+        decl_matches = self.patterns['declaration'].finditer(line) if has_semicolon else ()
+        for match in decl_matches:
             result['variables'].append(VariableInfo(
-                name=ptr_name,
-                type=ptr_type,
+                name=sys.intern(match.group('name')),
+                type=sys.intern(match.group('type')),
                 line_number=line_num,
-                is_initialized='=' in line,
-                is_pointer=True
+                is_initialized=line.find('=', match.end('name'), match.end()) != -1,
+                is_pointer=match.group('pointer') is not None
             ))
         
         # 函数定义
-        func_matches = self.patterns['function_definition'].findall(line)
-        for return_type, func_name in func_matches:
+        func_matches = self.patterns['function_definition'].finditer(line) if has_paren and has_brace else ()
+        for match in func_matches:
             result['functions'].append(FunctionInfo(
-                name=func_name,
-                return_type=return_type,
+                name=match.group('name'),
+                return_type=sys.intern(match.group('type') + (match.group('pointer') or '')),
                 parameters=[],  # 简化处理，不解析参数
                 line_number=line_num
             ))
         
         # 函数调用
-        call_matches = self.patterns['function_call'].findall(line)
+        call_matches = self.patterns['function_call'].findall(line) if has_paren else []
         for func_name in call_matches:
             # 过滤掉关键字和类型名
-            if func_name not in ['int', 'char', 'float', 'double', 'long', 'short', 'unsigned', 'signed', 'void', 'if', 'while', 'for', 'do', 'return', 'break', 'continue']:
+            if func_name not in NON_FUNCTION_KEYWORDS:
                 result['function_calls'].append({
-                    'name': func_name,
+                    'name': sys.intern(func_name),
                     'line': line_num,
-                    'line_content': line.strip()
+                    'line_content': line_content
                 })
         
         # 赋值语句
-        assign_matches = self.patterns['assignment'].findall(line)
+        assign_matches = self.patterns['assignment'].findall(line) if has_semicolon and '=' in line else []
         for var_name, value in assign_matches:
             result['assignments'].append({
                 'variable': var_name,
                 'value': value,
                 'line': line_num,
-                'line_content': line.strip()
+                'line_content': line_content
             })
         
         # 指针解引用
-        deref_matches = self.patterns['pointer_dereference'].findall(line)
+        deref_matches = self.patterns['pointer_dereference'].findall(line) if '*' in line else []
         for ptr_name in deref_matches:
             result['pointer_dereferences'].append({
-                'pointer': ptr_name,
+                'pointer': sys.intern(ptr_name),
                 'line': line_num,
-                'line_content': line.strip()
+                'line_content': line_content
             })
         
-        # malloc调用
-        malloc_matches = self.patterns['malloc_call'].findall(line)
-        for var_name in malloc_matches:
-            result['malloc_calls'].append({
-                'variable': var_name,
-                'line': line_num,
-                'line_content': line.strip()
-            })
+        # malloc/free、scanf/printf调用、循环结构、头文件包含
+        if not (has_paren or has_brace or '#' in line):
+            return
+        
+        found = set()
+        free_match = None
+        loop_match = {}
+        for match in self.patterns['statement'].finditer(line):
+            kind = match.lastgroup
+            if kind == 'free_call' and free_match is None:
+                free_match = match
+            if kind == 'while_loop' or kind == 'for_loop':
+                loop_match.setdefault(kind, match)
+            if kind == 'malloc_call':
+                result['malloc_calls'].append({
+                    'variable': match.group('malloc_var'),
+                    'line': line_num,
+                    'line_content': line_content
+                })
+            elif kind == 'include':
+                result['includes'].append({
+                    'header': sys.intern(match.group('header')),
+                    # <...>包含的是系统头文件，"..."包含的通常是项目自己的头文件
+                    'is_system': match.group('include_open') == '<',
+                    'line': line_num,
+                    'line_content': line_content
+                })
+            else:
+                found.add(kind)
+        
+        if not found:
+            return
         
         # free调用
-        if self.patterns['free_call'].search(line):
+        if free_match is not None:
             result['free_calls'].append({
+                'variable': free_match.group('free_var') or None,
                 'line': line_num,
-                'line_content': line.strip()
+                'line_content': line_content
             })
         
         # scanf调用
-        if self.patterns['scanf_call'].search(line):
+        if 'scanf_call' in found:
             result['scanf_calls'].append({
                 'line': line_num,
-                'line_content': line.strip()
+                'line_content': line_content
             })
         
         # printf调用
-        if self.patterns['printf_call'].search(line):
+        if 'printf_call' in found:
             result['printf_calls'].append({
                 'line': line_num,
-                'line_content': line.strip()
+                'line_content': line_content
             })
         
-        # 循环结构
-        if self.patterns['while_loop'].search(line):
+        # 循环结构（每行最多记录一个，优先级 while > for > do-while），同时记录循环条件
+        if 'while_loop' in found:
             result['loops'].append({
                 'type': 'while',
+                'condition': loop_match['while_loop'].group('while_cond').strip(),
                 'line': line_num,
-                'line_content': line.strip()
+                'line_content': line_content
             })
-        elif self.patterns['for_loop'].search(line):
+        elif 'for_loop' in found:
             result['loops'].append({
                 'type': 'for',
+                'condition': loop_match['for_loop'].group('for_cond').strip(),
                 'line': line_num,
-                'line_content': line.strip()
+                'line_content': line_content
             })
-        elif self.patterns['do_while_loop'].search(line):
+        elif 'do_while_loop' in found:
             result['loops'].append({
                 'type': 'do-while',
+                'condition': None,
                 'line': line_num,
-                'line_content': line.strip()
-            })
-        
-        # 头文件包含
-        include_matches = self.patterns['include'].findall(line)
-        for header in include_matches:
-            result['includes'].append({
-                'header': header,
-                'line': line_num,
-                'line_content': line.strip()
+                'line_content': line_content
             })
     
     def get_variable_by_name(self, name: str, parsed_data: Dict[str, List]) -> Optional[VariableInfo]:
         """根据名称获取变量信息"""
+        variables_by_name = parsed_data.get('variables_by_name')
+        if variables_by_name is not None:
+            return variables_by_name.get(name)
         for var in parsed_data['variables']:
             if var.name == name:
                 return var
         return None
     
+    def get_enclosing_function(self, line_num: int, parsed_data: Dict[str, List]) -> Optional[Tuple[str, int, int]]:
+        """获取某行所在函数的行范围 (函数名, 起始行, 结束行)"""
+        ranges = parsed_data.get('function_ranges')
+        if not ranges:
+            return None
+        i = bisect.bisect_right(parsed_data['function_starts'], line_num) - 1
+        if i >= 0 and ranges[i][2] >= line_num:
+            return ranges[i]
+        return None
+    
     def get_function_by_name(self, name: str, parsed_data: Dict[str, List]) -> Optional[FunctionInfo]:
         """根据名称获取函数信息"""
+        functions_by_name = parsed_data.get('functions_by_name')
+        if functions_by_name is not None:
+            return functions_by_name.get(name)
         for func in parsed_data['functions']:
             if func.name == name:
                 return func
@@ -1,7 +1,7 @@
 """
 错误报告器 - 为初学者提供易懂的错误报告
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Set
 from dataclasses import dataclass
 from enum import Enum
 
@@ -38,11 +38,25 @@ class ErrorReporter:
     
     def __init__(self):
         self.reports: List[BugReport] = []
+        # 已报告的问题（行号, 名称, 问题类别），用于去重
+        self.reported_issues: Set[tuple] = set()
     
     def add_report(self, report: BugReport):
         """添加错误报告"""
         self.reports.append(report)
     
+    def add_reports(self, reports: List[BugReport]):
+        """批量添加错误报告"""
+        self.reports.extend(reports)
+    
+    def first_report(self, line_num: int, name: str, category: str) -> bool:
+        """同一行、同一名称的同类问题只报告一次，首次出现时返回True"""
+        key = (line_num, name, category)
+        if key in self.reported_issues:
+            return False
+        self.reported_issues.add(key)
+        return True
+    
     def add_memory_error(self, line_num: int, message: str, suggestion: str, code_snippet: str = ""):
         """添加内存安全错误"""
         report = BugReport(
@@ -54,7 +68,7 @@ class ErrorReporter:
             code_snippet=code_snippet,
             module_name="内存安全卫士"
         )
-        self.add_report(report)
+        self.reports.append(report)
     
     def add_variable_error(self, line_num: int, message: str, suggestion: str, code_snippet: str = ""):
         """添加变量状态错误"""
@@ -67,7 +81,7 @@ class ErrorReporter:
             code_snippet=code_snippet,
             module_name="变量状态监察官"
         )
-        self.add_report(report)
+        self.reports.append(report)
     
     def add_library_error(self, line_num: int, message: str, suggestion: str, code_snippet: str = ""):
         """添加标准库使用错误"""
@@ -80,7 +94,7 @@ class ErrorReporter:
             code_snippet=code_snippet,
             module_name="标准库使用助手"
         )
-        self.add_report(report)
+        self.reports.append(report)
     
     def add_numeric_error(self, line_num: int, message: str, suggestion: str, code_snippet: str = ""):
         """添加数值与控制流错误"""
@@ -93,7 +107,7 @@ class ErrorReporter:
             code_snippet=code_snippet,
             module_name="数值与控制流分析器"
         )
-        self.add_report(report)
+        self.reports.append(report)
     
     def get_reports(self) -> List[BugReport]:
         """获取所有错误报告"""
@@ -106,6 +120,7 @@ class ErrorReporter:
     def clear_reports(self):
         """清空所有报告"""
         self.reports.clear()
+        self.reported_issues.clear()
     
     def format_report(self, report: BugReport) -> str:
         """格式化单个报告"""
@@ -120,14 +135,18 @@ class ErrorReporter:
     
     def format_all_reports(self) -> str:
         """格式化所有报告"""
-        if not self.reports:
+        return self.format_reports(self.reports)
+    
+    def format_reports(self, reports: List[BugReport]) -> str:
+        """格式化给定的报告列表（如多进程分析时子进程返回的报告）"""
+        if not reports:
             return "✅ 恭喜！没有发现任何问题。"
         
-        result = f"📊 检测完成，共发现 {len(self.reports)} 个问题：\n"
-        result += "=" * 50 + "\n"
+        parts = [f"📊 检测完成，共发现 {len(reports)} 个问题：\n", "=" * 50 + "\n"]
+        separator = "-" * 30 + "\n"
         
-        for i, report in enumerate(self.reports, 1):
-            result += f"\n{i}. {self.format_report(report)}"
-            result += "-" * 30 + "\n"
+        for i, report in enumerate(reports, 1):
+            parts.append(f"\n{i}. {self.format_report(report)}")
+            parts.append(separator)
         
-        return result
+        return "".join(parts)